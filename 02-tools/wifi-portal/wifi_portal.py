@@ -5,12 +5,16 @@ Self-contained — no dependencies on voiceAssist directory.
 Hardware: ReSpeaker 2-mic button (GPIO17), APA102 LEDs via SPI.
 """
 import os
+import sys
 import subprocess
-import datetime
 import time
+import queue
+import logging
+import logging.handlers
 import socket
 import threading
 import atexit
+from functools import lru_cache
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs
 
@@ -23,15 +27,35 @@ HOTSPOT_PASSWORD       = "chochko123"
 HOTSPOT_IP             = "192.168.4.1"
 BUTTON_PIN             = 17
 PORTAL_TIMEOUT_SECONDS = 300
+VERIFY_SECONDS         = 30    # wait for the new network before giving up
 CREDENTIALS            = {}
+PORTAL_DONE            = threading.Event()   # credentials, cancel or timeout
 
 # --- Logging ---
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
+# Callers only enqueue the record; a listener thread does the formatting
+# and the (possibly blocking) stdout/journal write.
+_stdout = logging.StreamHandler(sys.stdout)
+_stdout.setFormatter(logging.Formatter(
+    '[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S'
+))
+_log_queue    = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _stdout)
+_logger       = logging.getLogger('wifi_portal')
+_logger.setLevel(logging.INFO)
+_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)   # flushes whatever is still queued
+
 def log(message):
-    ts   = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    line = f"[{ts}] {message}"
-    print(line)
+    _logger.info(message)
+
+def flush_log():
+    """Block until every queued line has been written out."""
+    _log_listener.stop()    # drains the queue and joins the thread
+    _log_listener.start()
 
 # --- LEDs (APA102 via SPI) ---
 # Fatal — hardware is required
@@ -47,12 +71,13 @@ N_LEDS = 3
 BLUE   = (0, 0, 80)
 RED    = (80, 0, 0)
 
+@lru_cache(maxsize=None)
+def _led_frame(r, g, b) -> bytes:
+    """Complete SPI frame for one colour — built once, reused by every blink."""
+    return bytes([0] * 4 + [0xFF, b, g, r] * N_LEDS + [0xFF] * 4)   # APA102: BGR
+
 def _led_write(r, g, b):
-    buf = [0] * 4
-    for _ in range(N_LEDS):
-        buf += [0xFF, b, g, r]   # APA102: BGR order
-    buf += [0xFF] * 4
-    _spi.xfer2(buf)
+    _spi.writebytes2(_led_frame(r, g, b))   # write-only, no read-back
 
 def led_all(color: tuple):
     _led_write(*color)
@@ -134,16 +159,41 @@ def run_cmd(command, check=True) -> bool:
         log(f"  ERROR: {e}")
         return False
 
-def check_internet(host="8.8.8.8", port=53, timeout=3) -> bool:
+def nm_connectivity() -> str:
+    """NetworkManager's own connectivity state — no network probe.
+    Without NM connectivity checking "full" only means a default route."""
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(timeout)
-            s.connect((host, port))
-        log("Internet OK ✓")
-        return True
+        r = subprocess.run(
+            ['nmcli', '-t', '-f', 'CONNECTIVITY', 'general'],
+            capture_output=True, text=True, timeout=5
+        )
+        return r.stdout.strip()
     except Exception:
+        return "unknown"
+
+def reboot():
+    """Flush the log and the new NM profile to disk, then reboot at once."""
+    flush_log()
+    os.sync()
+    run_cmd(["reboot"], check=False)
+
+def check_internet(host="8.8.8.8", port=53, timeout=3, quiet=False) -> bool:
+    """quiet=True skips the "No internet" line — for polling loops."""
+    # Only NM's "none" (no route at all) is conclusive. "full" is not: with
+    # connectivity checking off (the Debian/RPi OS default) NM reports it
+    # whenever there is a default route, uplink or not — so still probe.
+    if nm_connectivity() != "none":
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.settimeout(timeout)
+                s.connect((host, port))
+            log("Internet OK ✓")
+            return True
+        except Exception:
+            pass
+    if not quiet:
         log("No internet")
-        return False
+    return False
 
 def get_last_wifi() -> str | None:
     """Get most recently used WiFi connection name."""
@@ -167,24 +217,37 @@ def get_last_wifi() -> str | None:
         return None
 
 # --- Network ---
+def wait_wlan_state(state: str, timeout=3.0) -> bool:
+    """Poll wlan0's NetworkManager state instead of sleeping a fixed time."""
+    deadline = time.monotonic() + timeout
+    while (left := deadline - time.monotonic()) > 0:
+        try:
+            r = subprocess.run(
+                ['nmcli', '-g', 'GENERAL.STATE', 'device', 'show', 'wlan0'],
+                capture_output=True, text=True, timeout=left
+            )
+        except subprocess.TimeoutExpired:
+            break   # hung nmcli — don't outlive the cap
+        if state in r.stdout:   # e.g. "30 (disconnected)"
+            return True
+        time.sleep(0.1)
+    log(f"wlan0 not {state} after {timeout}s — continuing")
+    return False
+
 def start_hotspot() -> bool:
     log("Starting hotspot...")
     run_cmd(["nmcli", "device", "disconnect", "wlan0"], check=False)
-    time.sleep(1)
+    wait_wlan_state("disconnected")
+    # Synchronous — the profile is gone when nmcli returns
     run_cmd(["nmcli", "connection", "delete", HOTSPOT_SSID], check=False)
-    time.sleep(1)
 
+    # Whole AP profile in one add — no separate modify round-trip
     if not run_cmd([
         "nmcli", "connection", "add",
         "type", "wifi", "ifname", "wlan0",
         "con-name", HOTSPOT_SSID,
         "autoconnect", "no",
-        "ssid", HOTSPOT_SSID
-    ]):
-        return False
-
-    if not run_cmd([
-        "nmcli", "connection", "modify", HOTSPOT_SSID,
+        "ssid", HOTSPOT_SSID,
         "802-11-wireless.mode", "ap",
         "802-11-wireless.band", "bg",
         "802-11-wireless-security.key-mgmt", "wpa-psk",
@@ -198,7 +261,7 @@ def start_hotspot() -> bool:
 
 def stop_hotspot(reconnect=True):
     log("Stopping hotspot...")
-    run_cmd(["nmcli", "connection", "down",   HOTSPOT_SSID], check=False)
+    # delete deactivates an active profile itself — no separate down
     run_cmd(["nmcli", "connection", "delete", HOTSPOT_SSID], check=False)
     if reconnect:
         last = get_last_wifi()
@@ -209,57 +272,116 @@ def stop_hotspot(reconnect=True):
         else:
             log("No saved WiFi to reconnect to")
 
-def scan_wifi() -> list:
-    log("Scanning WiFi...")
+# Scan results are cached and refreshed in the background, so a page load
+# never blocks on a rescan. "thread" is the scan in flight, if any.
+SCAN_TTL    = 30
+_scan_lock  = threading.Lock()
+_scan_cache = {"ssids": [], "ts": 0.0, "thread": None}
+
+def _scan_worker():
+    ssids = None
     try:
-        run_cmd(["nmcli", "device", "wifi", "rescan"])
-        time.sleep(3)
-        r = subprocess.check_output(
-            ['nmcli', '-t', '-f', 'SSID', 'dev', 'wifi', 'list']
-        ).decode('utf-8')
-        return sorted(set(
-            line.strip() for line in r.splitlines()
-            if line.strip() and line.strip() != HOTSPOT_SSID
-        ))
+        # --rescan yes waits for the scan itself — no fixed sleep
+        r = subprocess.run(
+            ['sudo', 'nmcli', '-t', '-f', 'SSID',
+             'dev', 'wifi', 'list', '--rescan', 'yes'],
+            capture_output=True, text=True, timeout=30
+        )
+        if r.returncode == 0:
+            ssids = sorted(set(
+                line.strip() for line in r.stdout.splitlines()
+                if line.strip() and line.strip() != HOTSPOT_SSID
+            ))
+            log(f"Scan: {len(ssids)} networks")
+        else:
+            # Keep the previous list — an empty stdout isn't "no networks"
+            log(f"Scan failed ({r.returncode}): {r.stderr.strip()}")
     except Exception as e:
         log(f"Scan error: {e}")
-        return []
+    with _scan_lock:
+        if ssids is not None:
+            _scan_cache["ssids"] = ssids
+            _scan_cache["ts"]    = time.monotonic()
+        _scan_cache["thread"] = None
+
+def start_scan() -> threading.Thread:
+    """Refresh the scan cache in the background; joins a running scan."""
+    with _scan_lock:
+        t = _scan_cache["thread"]
+        if t is None:
+            log("Scanning WiFi...")
+            t = threading.Thread(target=_scan_worker, daemon=True)
+            _scan_cache["thread"] = t
+            t.start()
+        return t
+
+def scan_wifi(wait=10) -> list:
+    with _scan_lock:
+        ssids = _scan_cache["ssids"]
+        fresh = time.monotonic() - _scan_cache["ts"] < SCAN_TTL
+    if fresh:
+        return ssids
+    t = start_scan()
+    if not ssids:
+        # Nothing to show yet — wait for the first scan instead of an empty list
+        t.join(wait)
+        with _scan_lock:
+            ssids = _scan_cache["ssids"]
+    return ssids
 
 def add_wifi_network(ssid, password) -> bool:
     log(f"Connecting to: {ssid}")
-    if subprocess.run(
-        ['nmcli', 'connection', 'show', ssid], capture_output=True
-    ).returncode == 0:
+    # One listing of all profiles, matched locally. --escape no, or terse
+    # mode backslash-escapes ':' and backslashes in names and they never match.
+    r = subprocess.run(
+        ['nmcli', '-t', '--escape', 'no', '-f', 'NAME', 'connection', 'show'],
+        capture_output=True, text=True
+    )
+    if ssid in r.stdout.splitlines():
+        # Synchronous — the profile is gone when nmcli returns
         run_cmd(["nmcli", "connection", "delete", ssid], check=False)
-        time.sleep(1)
     cmd = ["nmcli", "device", "wifi", "connect", ssid]
     if password:
         cmd.extend(["password", password])
     return run_cmd(cmd)
 
 # --- Web Server ---
+def _read_page(name: str) -> bytes | None:
+    path = os.path.join(script_dir, name)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        log(f"{name} not found at {path}")
+        return None
+
+# Pages are read once and served from memory; index.html is pre-split
+# around the marker so a request only encodes the <option> list.
+_index   = _read_page("index.html")
+_SUCCESS = _read_page("success.html")
+if _index is not None:
+    _INDEX_HEAD, _, _INDEX_TAIL = _index.partition(b"<!--WIFI_OPTIONS-->")
+
 class ConfigHTTPRequestHandler(BaseHTTPRequestHandler):
     def log_message(self, format, *args):
         pass  # suppress access log
 
     def do_GET(self):
         if self.path == '/':
-            html_path = os.path.join(script_dir, "index.html")
-            try:
-                with open(html_path, "r") as f:
-                    html = f.read()
-                options = "".join(
-                    f'<option value="{s}">{s}</option>'
-                    for s in scan_wifi()
-                )
-                html = html.replace("<!--WIFI_OPTIONS-->", options)
-                self.send_response(200)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                self.wfile.write(html.encode("utf-8"))
-            except FileNotFoundError:
-                log(f"FATAL: index.html not found at {html_path}")
+            if _index is None:
+                log(f"FATAL: index.html not found in {script_dir}")
                 self.wfile.write(b"Error: index.html not found")
+                return
+            options = "".join(
+                f'<option value="{s}">{s}</option>'
+                for s in scan_wifi()
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-type", "text/html")
+            self.end_headers()
+            self.wfile.write(_INDEX_HEAD)
+            self.wfile.write(options)
+            self.wfile.write(_INDEX_TAIL)
         else:
             self.send_error(404)
 
@@ -274,15 +396,13 @@ class ConfigHTTPRequestHandler(BaseHTTPRequestHandler):
                 CREDENTIALS['ssid']     = ssid
                 CREDENTIALS['password'] = password
                 log(f"Credentials received: {ssid}")
-                success_path = os.path.join(script_dir, "success.html")
                 self.send_response(200)
                 self.send_header("Content-type", "text/html")
                 self.end_headers()
-                try:
-                    with open(success_path, "rb") as f:
-                        self.wfile.write(f.read())
-                except FileNotFoundError:
-                    self.wfile.write(b"Configuration received. Rebooting.")
+                self.wfile.write(
+                    _SUCCESS or b"Configuration received. Rebooting."
+                )
+                PORTAL_DONE.set()   # after the reply, so the page gets out
             else:
                 self.send_error(400, "SSID not provided")
         else:
@@ -303,13 +423,15 @@ def run_portal(led: LedController) -> bool:
         return False
 
     led.start_pulse(BLUE)
+    start_scan()   # prime the list while the user joins the hotspot
     log(f"Portal active → connect to '{HOTSPOT_SSID}' / '{HOTSPOT_PASSWORD}' → http://{HOTSPOT_IP}")
 
     # Wait for button release before watching for cancel
     wait_for_button_release()
 
     cancelled = threading.Event()
-    done      = threading.Event()
+    done      = PORTAL_DONE
+    done.clear()
 
     def watch_cancel():
         time.sleep(0.5)  # debounce
@@ -319,22 +441,19 @@ def run_portal(led: LedController) -> bool:
                 cancelled.set()
                 done.set()
                 break
-            time.sleep(0.1)
+            done.wait(0.1)
 
     threading.Thread(target=watch_cancel, daemon=True).start()
 
-    httpd      = HTTPServer(('', 80), ConfigHTTPRequestHandler)
-    httpd.timeout = 1
-    start_time = time.time()
-
-    while not done.is_set():
-        httpd.handle_request()
-        if CREDENTIALS:
-            done.set()
-        if (time.time() - start_time) > PORTAL_TIMEOUT_SECONDS:
-            log("Portal timeout")
-            done.set()
+    # Serve in the background and sleep until POST, cancel or timeout —
+    # no per-second handle_request() wakeups.
+    httpd = HTTPServer(('', 80), ConfigHTTPRequestHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    if not done.wait(PORTAL_TIMEOUT_SECONDS):
+        log("Portal timeout")
+        done.set()
 
+    httpd.shutdown()
     httpd.server_close()
     led.stop_pulse()
     led_off()
@@ -351,20 +470,22 @@ def run_portal(led: LedController) -> bool:
         password = CREDENTIALS['password']
         if add_wifi_network(ssid, password):
             log("Verifying connection...")
-            for i in range(15):
-                if check_internet():
+            deadline = time.monotonic() + VERIFY_SECONDS
+            attempt  = 0
+            while time.monotonic() < deadline:
+                attempt += 1
+                if check_internet(quiet=True):
                     log(f"SUCCESS — rebooting")
-                    time.sleep(3)
-                    run_cmd(["reboot"], check=False)
+                    reboot()
                     return True
-                log(f"Attempt {i+1}/15...")
-                time.sleep(2)
+                if attempt % 10 == 0:   # one line per ~5s, not per poll
+                    log(f"Attempt {attempt} — no internet yet...")
+                time.sleep(0.5)
             log("FAILED to verify — rebooting")
             run_cmd(["nmcli", "connection", "delete", ssid], check=False)
         else:
             log("Connection command failed — rebooting")
-        time.sleep(3)
-        run_cmd(["reboot"], check=False)
+        reboot()
         return True
 
     return False
@@ -395,12 +516,10 @@ def red_blink_cycle(led: LedController, blinks=RED_BLINK_COUNT) -> bool:
         if _wait_button(0.5):
             led_off()
             log(f"Button pressed (blink {i+1}/{blinks})")
-            time.sleep(0.2)
             return True
         led_off()
         if _wait_button(0.5):
             log(f"Button pressed (blink {i+1}/{blinks})")
-            time.sleep(0.2)
             return True
     return False
 
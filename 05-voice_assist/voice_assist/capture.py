@@ -2,40 +2,58 @@ import sounddevice as sd
 import numpy as np
 import scipy.signal
 import threading
+import queue
 import logging
 
 log = logging.getLogger(__name__)
 
 RATE_HW   = 48000
 RATE_APP  = 16000
-CHUNK_APP = 1280
-CHUNK_HW  = int(CHUNK_APP * RATE_HW / RATE_APP)  # 3840
+CHUNK_APP = 1280                  # 80 ms — openWakeWord's native frame
+DECIMATE  = RATE_HW // RATE_APP   # 3
+CHUNK_HW  = CHUNK_APP * DECIMATE  # 3840 — one hardware block per app frame
+SCALE_I32 = np.float32(1.0 / 2147483648.0)
+QUEUE_MAX = 25   # blocks (~2s) buffered ahead of the processing thread
+
+# resample_poly's default anti-alias filter, designed once instead of per block.
+# float32 like the audio — a float64 window makes resample_poly filter in float64.
+FIR_DOWN  = scipy.signal.firwin(
+    2 * 10 * DECIMATE + 1, 1.0 / DECIMATE, window=('kaiser', 5.0)
+).astype(np.float32)
 
 class MicCapture:
     def __init__(self):
-        self._consumers = []
+        self._consumers = ()   # immutable — replaced, never mutated
         self._lock      = threading.Lock()
         self._stream    = None
         self._muted     = False
+        self._f32       = np.empty(CHUNK_HW, dtype=np.float32)
+        self._queue     = queue.Queue(maxsize=QUEUE_MAX)
+        self._stop      = threading.Event()
+        self._thread    = None
 
+    # Writers publish a new tuple under the lock; the worker reads the
+    # attribute without it — one atomic reference load per block.
     def add_consumer(self, fn):
         with self._lock:
-            self._consumers.append(fn)
+            self._consumers = self._consumers + (fn,)
 
     def remove_consumer(self, fn):
         with self._lock:
-            if fn in self._consumers:
-                self._consumers.remove(fn)
+            self._consumers = tuple(c for c in self._consumers if c != fn)
 
     def clear_consumers(self):
         with self._lock:
-            self._consumers.clear()
+            self._consumers = ()
 
     def set_mute(self, muted: bool):
         self._muted = muted
 
     def start(self):
         import config
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._process_loop, daemon=True)
+        self._thread.start()
         self._stream = sd.InputStream(
             device=config.PIPEWIRE_DEVICE,
             samplerate=RATE_HW,
@@ -55,26 +73,46 @@ class MicCapture:
             except Exception as e:
                 log.warning(f'MicCapture stop error: {e}')
             self._stream = None
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
         log.info('MicCapture stopped')
 
     def _callback(self, indata, frames, time_info, status):
+        """PortAudio thread — only hand the block over, never process it here."""
         if status:
             log.warning(f'MicCapture: {status}')
         if self._muted:
             return
+        try:
+            self._queue.put_nowait(indata[:, 0].copy())
+        except queue.Full:
+            log.warning('MicCapture queue full — dropping block')
+
+    def _process_loop(self):
+        while not self._stop.is_set():
+            try:
+                block = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._process(block)
 
-        # AEC Source: mono int32 → float32
-        mono_f32 = indata[:, 0].astype(np.float32) / 2147483648.0
+    def _process(self, block: np.ndarray):
+        # AEC Source: mono int32 → float32, cast+scale in one pass
+        mono_f32 = self._f32[:len(block)]
+        np.multiply(block, SCALE_I32, out=mono_f32,
+                    dtype=np.float32, casting='unsafe')
 
         # Resample 48kHz → 16kHz
-        mono_16k = scipy.signal.resample_poly(mono_f32, 1, 3)
+        mono_16k = scipy.signal.resample_poly(mono_f32, 1, DECIMATE,
+                                              window=FIR_DOWN)
 
         # Convert to int16 for openWakeWord + Gemini
         mono_i16 = (mono_16k * 32767).astype(np.int16)
 
-        with self._lock:
-            for fn in list(self._consumers):
-                try:
-                    fn(mono_i16)
-                except Exception as e:
-                    log.error(f'Consumer error: {e}')
\ No newline at end of file
+        # Lock-free snapshot — a concurrent add/remove swaps in a new tuple
+        for fn in self._consumers:
+            try:
+                fn(mono_i16)
+            except Exception as e:
+                log.error(f'Consumer error: {e}')
\ No newline at end of file
@@ -1,5 +1,6 @@
 import numpy as np
 import logging
+from functools import lru_cache
 
 log = logging.getLogger(__name__)
 
@@ -22,8 +23,15 @@ def _tone(freq: float, duration: float,
     wave[-fade:] *= np.linspace(1, 0, fade)
     return (wave * volume).astype(np.float32)
 
-def _play(segments: list):
-    audio = np.concatenate(segments)
+@lru_cache(maxsize=None)
+def _sequence(notes: tuple) -> np.ndarray:
+    """Render (freq, duration) notes once into one contiguous buffer."""
+    audio = np.concatenate([_tone(freq, dur) for freq, dur in notes])
+    audio.flags.writeable = False   # shared by every play of this chime
+    return audio
+
+def _play(notes: tuple):
+    audio = _sequence(notes)
     if _speaker:
         _speaker.play_f32(audio)
     else:
@@ -33,20 +41,20 @@ def _play(segments: list):
 
 def wake_detected():
     log.debug('Chime: wake detected')
-    _play([
-        _tone(880,  0.12),
-        _tone(1047, 0.12),
-        _tone(1319, 0.18),
-    ])
+    _play((
+        (880,  0.12),
+        (1047, 0.12),
+        (1319, 0.18),
+    ))
 
 def dialog_ended():
     log.debug('Chime: dialog ended')
-    _play([
-        _tone(1319, 0.12),
-        _tone(1047, 0.12),
-        _tone(880,  0.18),
-    ])
+    _play((
+        (1319, 0.12),
+        (1047, 0.12),
+        (880,  0.18),
+    ))
 
 def error():
     log.debug('Chime: error')
-    _play([_tone(220, 0.20)])
\ No newline at end of file
+    _play(((220, 0.20),))
\ No newline at end of file
@@ -12,10 +12,7 @@ def _find_pipewire_device() -> int:
 
 # ── Audio ─────────────────────────────────────────────────
 PIPEWIRE_DEVICE = _find_pipewire_device()
-RATE_HW          = 48000
-RATE_APP         = 16000
-CHUNK_APP        = 1280
-CHUNK_HW         = int(CHUNK_APP * RATE_HW / RATE_APP)  # 3840
+# Rates and block sizes live in capture.py (RATE_HW, RATE_APP, CHUNK_*)
 
 # ── Wake Word ──────────────────────────────────────────────────────────
 USE_MICROWAKEWORD = False   # True = microWakeWord, False = openWakeWord
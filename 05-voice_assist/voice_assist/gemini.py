@@ -1,5 +1,6 @@
 import asyncio
 import base64
+import collections
 import json
 import logging
 import os
@@ -14,6 +15,12 @@ GEMINI_WS = (
     'google.ai.generativelanguage.v1beta.'
     'GenerativeService.BidiGenerateContent'
 )
+AUDIO_COALESCE = 4   # max mic chunks merged per message (4 × 80ms)
+OUTBOX_MAX     = 8   # mic chunks kept behind a stalled send (~640ms)
+
+# Encoded setup messages, keyed by the inputs that shape them. A new client
+# is created for every dialog, but the tools/prompt rarely change.
+_SETUP_CACHE = {}
 
 class GeminiLiveClient:
     def __init__(self, on_audio, on_turn_complete,
@@ -28,7 +35,11 @@ class GeminiLiveClient:
         self._ha_connected      = ha_connected
         self._ha_devices = ha_devices or []
         self._ws                = None
-        self._send_queue        = None
+        self._loop              = None
+        # Outgoing messages: mic chunks (np.ndarray) and tool responses (dict).
+        # deque append/popleft are thread-safe; _send_event wakes _send_loop.
+        self._outbox            = collections.deque()
+        self._send_event        = None
         self._running           = False
 
     def _build_setup(self) -> dict:
@@ -239,14 +250,27 @@ class GeminiLiveClient:
 
         return setup
 
+    def _setup_message(self) -> str:
+        key = (
+            self._spotify_connected,
+            self._ha_connected,
+            tuple(self._ha_devices[:20]),
+            bool(os.environ.get('OPENWEATHER_API_KEY')),
+            config.GEMINI_SYSTEM,
+        )
+        msg = _SETUP_CACHE.get(key)
+        if msg is None:
+            msg = _SETUP_CACHE[key] = json.dumps(self._build_setup())
+        return msg
+
     async def connect(self):
         url = f'{GEMINI_WS}?key={config.GEMINI_API_KEY}'
         self._ws         = await websockets.connect(url)
-        self._send_queue = asyncio.Queue()
+        self._loop       = asyncio.get_running_loop()
+        self._send_event = asyncio.Event()
         self._running    = True
 
-        setup = self._build_setup()
-        await self._ws.send(json.dumps(setup))
+        await self._ws.send(self._setup_message())
         await self._ws.recv()   # wait for setupComplete
         log.debug('Gemini Live connected')
 
@@ -255,6 +279,8 @@ class GeminiLiveClient:
 
     async def disconnect(self):
         self._running = False
+        if self._send_event:
+            self._send_event.set()   # let _send_loop see _running and exit
         if self._ws:
             try:
                 await self._ws.close()
@@ -264,22 +290,16 @@ class GeminiLiveClient:
         log.debug('Gemini Live disconnected')
 
     def send_audio(self, pcm_i16: np.ndarray):
-        """Send mic audio — mono int16 @ 16kHz. Thread-safe."""
-        if not self._running or self._send_queue is None:
+        """Send mic audio — mono int16 @ 16kHz. Thread-safe.
+
+        Only wakes the event loop when the outbox goes from empty to
+        non-empty; chunks arriving while _send_loop is busy ride along.
+        """
+        if not self._running:
             return
-        b64 = base64.b64encode(pcm_i16.tobytes()).decode()
-        msg = {
-            'realtime_input': {
-                'media_chunks': [{
-                    'mime_type': 'audio/pcm;rate=16000',
-                    'data': b64
-                }]
-            }
-        }
-        try:
-            self._send_queue.put_nowait(msg)
-        except asyncio.QueueFull:
-            log.warning('Send queue full — dropping audio')
+        self._outbox.append(pcm_i16)
+        if len(self._outbox) == 1:
+            self._loop.call_soon_threadsafe(self._send_event.set)
 
     def send_tool_responses(self, responses: list):
         """
@@ -296,28 +316,73 @@ class GeminiLiveClient:
 
         msg = {'tool_response': {'function_responses': function_responses}}
 
-        if self._send_queue:
-            try:
-                self._send_queue.put_nowait(msg)
-            except asyncio.QueueFull:
-                log.warning('Send queue full — dropping tool responses')
+        # Called on the event loop thread — set unconditionally, so a
+        # concurrent send_audio() can never leave _send_loop asleep.
+        if self._send_event:
+            self._outbox.append(msg)
+            self._send_event.set()
+
+    @staticmethod
+    def _audio_message(pcm_i16: np.ndarray) -> dict:
+        # Encode straight from the array buffer — the chunk is shared with
+        # the wake-word consumer, so don't materialize another copy.
+        return {
+            'realtime_input': {
+                'media_chunks': [{
+                    'mime_type': 'audio/pcm;rate=16000',
+                    'data': base64.b64encode(pcm_i16).decode()
+                }]
+            }
+        }
+
+    def _coalesce(self, pcm_i16: np.ndarray) -> np.ndarray:
+        """Merge mic chunks already waiting behind this one into one buffer.
+
+        Only backlog is merged (nothing waits for more audio), so this adds
+        no latency — it just saves JSON/base64/framing per chunk after a
+        stall. Stops at a tool response to keep message order.
+        """
+        chunks = [pcm_i16]
+        while (len(chunks) < AUDIO_COALESCE and self._outbox
+               and not isinstance(self._outbox[0], dict)):
+            chunks.append(self._outbox.popleft())
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+    def _drop_stale(self):
+        """After a stall keep only the newest OUTBOX_MAX mic chunks.
+
+        Runs on the event loop — the only thread that pops — so it can
+        never race another popleft. Stops at a tool response, which is
+        never dropped.
+        """
+        dropped = 0
+        while (len(self._outbox) > OUTBOX_MAX
+               and not isinstance(self._outbox[0], dict)):
+            self._outbox.popleft()
+            dropped += 1
+        if dropped:
+            log.warning(f'Gemini send stalled — dropped {dropped} stale '
+                        f'mic chunks ({dropped * 80}ms)')
 
     async def _send_loop(self):
         while self._running:
-            try:
-                msg = await asyncio.wait_for(
-                    self._send_queue.get(), timeout=1.0
-                )
-                # Ensure msg is a dict, not a coroutine
-                if not isinstance(msg, dict):
-                    log.error(f'Send loop: expected dict, got {type(msg)}')
-                    continue
-                await self._ws.send(json.dumps(msg))
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                log.error(f'Send error: {e}')
-                break
+            await self._send_event.wait()
+            self._send_event.clear()
+            while self._running:
+                self._drop_stale()
+                try:
+                    item = self._outbox.popleft()
+                except IndexError:
+                    break
+                if isinstance(item, dict):
+                    msg = item
+                else:
+                    msg = self._audio_message(self._coalesce(item))
+                try:
+                    await self._ws.send(json.dumps(msg))
+                except Exception as e:
+                    log.error(f'Send error: {e}')
+                    return
 
     async def _recv_loop(self):
         try:
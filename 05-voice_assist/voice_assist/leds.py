@@ -4,6 +4,9 @@ APA102 LED control for ReSpeaker 2-mic v2.0.
 IDLE: dim blue, DIALOG: magenta.
 """
 import logging
+import threading
+import time
+from functools import lru_cache
 
 log = logging.getLogger(__name__)
 N_LEDS = 3
@@ -19,17 +22,16 @@ except Exception as e:
     _HAS_SPI = False
     log.warning(f"LEDs not available: {e}")
 
-def _write(pixels: list):
-    if not _HAS_SPI:
-        return
-    buf = [0]*4
-    for r,g,b in pixels:
-        buf += [0xFF, b, g, r]   # APA102: BGR
-    buf += [0xFF]*4
-    _spi.xfer2(buf)
+@lru_cache(maxsize=None)
+def _frame(r: int, g: int, b: int) -> bytes:
+    """Complete SPI frame with every LED set to one colour — built once."""
+    return bytes([0]*4 + [0xFF, b, g, r] * N_LEDS + [0xFF]*4)   # APA102: BGR
 
 def _all(r: int, g: int, b: int):
-    _write([(r,g,b)] * N_LEDS)
+    if not _HAS_SPI:
+        return
+    # Write-only straight from the buffer — xfer2 also read back a list
+    _spi.writebytes2(_frame(r, g, b))
 
 def off():
     _all(0, 0, 0)
@@ -43,8 +45,11 @@ def dialog():
     _all(80, 0, 80)
 
 def error():
-    """Magenta fast blink — error/timeout."""
-    import time
+    """Magenta fast blink — error/timeout. Returns at once; blinks in a thread
+    so the event loop isn't held for ~0.75s."""
+    threading.Thread(target=_error_blink, daemon=True).start()
+
+def _error_blink():
     for _ in range(3):
         _all(80, 0, 80)
         time.sleep(0.15)
@@ -1,12 +1,17 @@
 import json
 import logging
 import os
+import socket
+import threading
 import requests
 
 log = logging.getLogger(__name__)
 
 LOCATION_FILE = os.path.join(os.path.dirname(__file__), 'location.json')
 
+_lock    = threading.Lock()   # read-modify-write of LOCATION_FILE
+_current = None               # {'country', 'town'} resolved once per process
+
 def _load_file() -> dict:
     try:
         with open(LOCATION_FILE, 'r', encoding='utf-8') as f:
@@ -18,9 +23,12 @@ def _load_file() -> dict:
         return {'current': {}, 'addresses': {}}
 
 def _save_file(data: dict):
+    """Write via temp file + rename so a crash never leaves a torn file."""
+    tmp = LOCATION_FILE + '.tmp'
     try:
-        with open(LOCATION_FILE, 'w', encoding='utf-8') as f:
+        with open(tmp, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, LOCATION_FILE)
     except Exception as e:
         log.error(f'Save location failed: {e}')
 
@@ -37,33 +45,62 @@ def get_ip_location() -> dict:
         log.warning(f'IP location failed: {e}')
         return {'country': '', 'town': ''}
 
+def _is_online(timeout: float = 1.0) -> bool:
+    """Fast reachability probe so an offline boot doesn't wait on HTTP."""
+    try:
+        socket.create_connection(('1.1.1.1', 53), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
 def _make_key(country: str, town: str) -> str:
     return f'{country}|{town}'
 
 def save_address(address: str, country: str, town: str):
     """Save address for specific country+town combination."""
-    data = _load_file()
-    key  = _make_key(country, town)
-    data['addresses'][key] = address
-    _save_file(data)
+    with _lock:
+        data = _load_file()
+        key  = _make_key(country, town)
+        data['addresses'][key] = address
+        _save_file(data)
     log.info(f'Address saved: {key} → {address}')
 
+def _resolve() -> tuple[dict, bool]:
+    """IP lookup; falls back to the last known location when offline.
+    Returns (location, live) — live is False for the fallback."""
+    ip_loc = get_ip_location() if _is_online() else {}
+    with _lock:
+        data = _load_file()
+        if not ip_loc.get('town'):
+            last = data.get('current') or {'country': '', 'town': ''}
+            log.info(f'IP location unavailable — using last known: {last}')
+            return last, False
+        # Update current location — skip the SD card write when unchanged
+        current = {'country': ip_loc['country'], 'town': ip_loc['town']}
+        if data.get('current') != current:
+            data['current'] = current
+            _save_file(data)
+        return current, True
+
 def get_current() -> dict:
     """
     Get current location with address if previously saved for this town.
-    Updates current location in file.
+    A successful IP lookup is kept for the process (the device doesn't move
+    while running); the offline fallback is not, so the next call retries.
+    The address is re-read so set_address takes effect at once.
     """
-    ip_loc  = get_ip_location()
-    country = ip_loc.get('country', '')
-    town    = ip_loc.get('town', '')
+    global _current
+    current = _current
+    if current is None:
+        current, live = _resolve()
+        if live:
+            _current = current
+    country = current.get('country', '')
+    town    = current.get('town', '')
     key     = _make_key(country, town)
 
     data = _load_file()
 
-    # Update current location
-    data['current'] = {'country': country, 'town': town}
-    _save_file(data)
-
     # Look up saved address for this town
     address = data['addresses'].get(key)
 
@@ -31,16 +31,24 @@ logging.getLogger().addHandler(_handler)
 log = logging.getLogger(__name__)
 
 import asyncio
+import concurrent.futures
 import signal
 import subprocess
-import numpy as np
+
+try:
+    import alsaaudio
+    _HAS_ALSA = True
+except ImportError:
+    _HAS_ALSA = False
 
 import config
 import leds
 import chimes
+import location
+import weather
 from capture import MicCapture
 from playback import Speaker
-from wakeword import WakeWordDetector
+from wakeword import create_detector
 from gemini import GeminiLiveClient
 from spotify import SpotifyController
 from smarthome import SmartHome
@@ -54,9 +62,10 @@ class VoiceAssistant:
         self.mic      = MicCapture()
         self.speaker  = Speaker()
 
-        self.wakeword = WakeWordDetector(
-            model_path=config.WAKEWORD_MODEL,
-            threshold=config.WAKEWORD_THRESH
+        self.wakeword = create_detector(
+            backend    = config.WAKEWORD_BACKEND,
+            model_path = config.WAKEWORD_MODEL,
+            threshold  = config.WAKEWORD_THRESH
         )
         self.button   = Button()
         self.gemini   = None
@@ -65,31 +74,33 @@ class VoiceAssistant:
 
         self._dialog_task    = None
         self._end_event      = None
-        self._last_activity  = 0.0
+        self._timeout_handle = None
         self._gemini_speaking = False
         self._end_after_turn = False
+        self._ducked         = False  # Spotify lowered for this dialog
         self._volume         = 100
         self._VOLUME_STEP    = 15
-        
-        from wakeword import create_detector
-        self.wakeword = create_detector(
-            backend    = config.WAKEWORD_BACKEND,
-            model_path = config.WAKEWORD_MODEL,
-            threshold  = config.WAKEWORD_THRESH
-        )
+        self._mixer          = self._open_mixer()
+        self._mixer_level    = None   # last level written; None = unknown
+        self._tool_handlers  = {
+            'set_address':    self._tool_set_address,
+            'set_volume':     self._tool_set_volume,
+            'get_weather':    self._tool_get_weather,
+            'play_music':     self._tool_play_music,
+            'next_track':     self._tool_next_track,
+            'previous_track': self._tool_previous_track,
+            'pause_music':    self._tool_pause_music,
+            'resume_music':   self._tool_resume_music,
+            'transfer_music': self._tool_transfer_music,
+            'end_dialog':     self._tool_end_dialog,
+            'ha_control':     self._handle_ha,
+        }
 
     def setup(self, loop: asyncio.AbstractEventLoop):
         self.loop = loop
 
-        # Build system prompt with location — called once at startup
-        try:
-            import location as loc_module
-            loc     = loc_module.get_current()
-            loc_str = loc_module.format_for_prompt(loc)
-            config.GEMINI_SYSTEM += loc_str
-            log.info(f'Location: {loc_str}')
-        except Exception as e:
-            log.warning(f'Location unavailable: {e}')
+        # The location is resolved once in config and is already part of
+        # config.GEMINI_SYSTEM — appending it here again duplicated it.
 
         self.wakeword.set_loop(loop)
         self.wakeword.set_on_detect(self._on_wake)
@@ -103,13 +114,19 @@ class VoiceAssistant:
         self.mic.start()
         self.button.start()
 
-        self.smarthome.connect()
+        # Both block on the network (HA alias load can take seconds) and
+        # are independent — connect them side by side
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            futures = (pool.submit(self.smarthome.connect),
+                       pool.submit(self.spotify.connect))
+        for f in futures:
+            f.result()   # re-raise anything connect() let escape, as before
+
         if self.smarthome.connected:
             log.info('Home Assistant ready')
         else:
             log.info('Home Assistant not available')
 
-        self.spotify.connect()
         if self.spotify.connected:
             log.info('Spotify ready')
         else:
@@ -131,19 +148,11 @@ class VoiceAssistant:
         self.state = 'IDLE'
         log.info('State: IDLE')
         self.mic.clear_consumers()
-        self.mic.add_consumer(self._wakeword_consumer)
+        # Bound method straight in — no extra Python frame per 80ms chunk
+        self.mic.add_consumer(self.wakeword.process)
         self.button.set_on_press(self._on_wake)
         leds.idle()
 
-    def _wakeword_consumer(self, pcm_i16: np.ndarray):
-        self.wakeword.process(pcm_i16)
-        
-    def _on_gemini_audio_consumer(self, pcm_i16: np.ndarray):
-        """Mic consumer during dialog — resets timeout while user speaks."""
-        if self.gemini is None:
-            return
-        self.gemini.send_audio(pcm_i16)
-
     def _on_wake(self):
         if self.state != 'IDLE':
             log.info('Wake ignored — already in DIALOG')
@@ -170,11 +179,12 @@ class VoiceAssistant:
         # Duck Spotify — run in thread with timeout
         if self.spotify.connected:
             try:
-                current = await asyncio.wait_for(
-                    self.loop.run_in_executor(None, self.spotify.get_current),
+                playing = await asyncio.wait_for(
+                    self.loop.run_in_executor(None, self.spotify.is_playing),
                     timeout=3.0
                 )
-                if current and current.get('playing'):
+                if playing:
+                    self._ducked = True
                     await self.loop.run_in_executor(
                         None, self.spotify.set_volume, 75
                     )
@@ -200,7 +210,8 @@ class VoiceAssistant:
             await asyncio.wait_for(self.gemini.connect(), timeout=10.0)
             log.info('Gemini connected')
             self.mic.clear_consumers()
-            self.mic.add_consumer(self._on_gemini_audio_consumer)
+            # Straight to the client — send_audio is a no-op once disconnected
+            self.mic.add_consumer(self.gemini.send_audio)
             await self._dialog_loop()
 
         except asyncio.TimeoutError:
@@ -221,25 +232,34 @@ class VoiceAssistant:
     async def _dialog_loop(self):
         """Keep dialog alive until button, timeout, or turnComplete signal."""
         WATCHDOG = 120  # absolute maximum 2 minutes
-        
-        self._last_activity   = self.loop.time()
+
         self._gemini_speaking = False
+        self._arm_timeout()
+        remaining = WATCHDOG - (self.loop.time() - self._dialog_start)
+        try:
+            await asyncio.wait_for(self._end_event.wait(), max(remaining, 0))
+        except asyncio.TimeoutError:
+            log.warning('Dialog watchdog — forcing IDLE')
+        finally:
+            self._cancel_timeout()
 
-        while not self._end_event.is_set():
-            await asyncio.sleep(0.5)
-            now  = self.loop.time()
-            idle = now - self._last_activity
+    def _arm_timeout(self):
+        """(Re)start the idle timer — runs only while Gemini is silent."""
+        self._cancel_timeout()
+        self._timeout_handle = self.loop.call_later(
+            config.DIALOG_TIMEOUT, self._on_dialog_timeout
+        )
 
-            # Watchdog
-            if now - self._dialog_start > WATCHDOG:
-                log.warning('Dialog watchdog — forcing IDLE')
-                break
+    def _cancel_timeout(self):
+        if self._timeout_handle:
+            self._timeout_handle.cancel()
+            self._timeout_handle = None
 
-            # Timeout only when Gemini not speaking
-            if not self._gemini_speaking:
-                if idle > config.DIALOG_TIMEOUT:
-                    log.info(f'Dialog timeout after {config.DIALOG_TIMEOUT}s')
-                    break
+    def _on_dialog_timeout(self):
+        self._timeout_handle = None
+        log.info(f'Dialog timeout after {config.DIALOG_TIMEOUT}s')
+        if self._end_event:
+            self._end_event.set()
 
     def _request_end_dialog(self):
         log.info('Button pressed — ending dialog')
@@ -263,13 +283,14 @@ class VoiceAssistant:
         self.enter_idle()
 
     def _on_gemini_audio(self, pcm_24k: bytes):
-        self._gemini_speaking = True
-        self._last_activity   = self.loop.time()
+        if not self._gemini_speaking:
+            self._gemini_speaking = True
+            self._cancel_timeout()
         self.speaker.play_gemini(pcm_24k)
 
     def _on_turn_complete(self):
         self._gemini_speaking = False
-        self._last_activity   = self.loop.time()
+        self._arm_timeout()
         log.info('Gemini turn complete — listening...')
         if self._end_after_turn:
             self._end_after_turn = False
@@ -279,86 +300,26 @@ class VoiceAssistant:
     def _on_interrupted(self):
         self._gemini_speaking = False
         self.speaker.clear()
-        self._last_activity = self.loop.time()
+        self._arm_timeout()
         log.info('Gemini interrupted by user')
 
     def _on_gemini_text(self, text: str):
         log.info(f'Gemini: {text}')
 
     def _on_tool_call(self, calls: list):
-        responses  = []
-        scheduling = None
+        responses = []
 
         for call in calls:
             name    = call.get('name', '')
             args    = call.get('args', {})
             call_id = call.get('id', '')
-            result  = 'OK'
-
-            if name == 'set_address':
-                import location
-                loc     = location.get_current()
-                address = args.get('address', '')
-                location.save_address(address, loc['country'], loc['town'])
-                log.info(f'Address saved: {address}')
-                result = 'Адресът е запазен.'
-
-            elif name == 'set_volume':
-                action = args.get('action', '').lower()
-                result = self._handle_volume(action)
-
-            elif name == 'get_weather':
-                import weather, location
-                town = args.get('town', '')
-                if not town:
-                    loc     = location.get_current()
-                    town    = loc.get('town', '')
-                    country = loc.get('country', '')
-                else:
-                    country = ''
-                w      = weather.get_weather(town, country)
-                result = weather.format_for_gemini(w)
-                log.info(f'Weather: {result}')
-
-            elif name == 'play_music':
-                query = args.get('query', '')
-                self.loop.run_in_executor(None, self.spotify.play, query)
-                result               = f'Пускам {query}' if query else 'Продължавам музиката.'
-                self._end_after_turn = True
-
-            elif name == 'next_track':      
-                self.loop.run_in_executor(None, self.spotify.next_track)
-                result               = 'Следваща песен.'
-                self._end_after_turn = True   # end after Gemini confirms
-
-            elif name == 'previous_track':
-                self.loop.run_in_executor(None, self.spotify.previous_track)
-                result               = 'Предишна песен.'
-                self._end_after_turn = True
-
-            elif name == 'pause_music':
-                self.loop.run_in_executor(None, self.spotify.pause)
-                result               = 'Музиката е на пауза.'
-                self._end_after_turn = True
-
-            elif name == 'resume_music':
-                self.loop.run_in_executor(None, self.spotify.resume)
-                result               = 'Продължавам музиката.'
-                self._end_after_turn = True
-
-            elif name == 'transfer_music':
-                device_name          = args.get('device_name', '')
-                result               = self.spotify.transfer(device_name)
-                self._end_after_turn = True
-
-            elif name == 'end_dialog':
-                result               = 'Дочуване!'
-                self._end_after_turn = True
-                scheduling           = 'WHEN_IDLE'
-
-            elif name == 'ha_control':
-                result = self._handle_ha(args)
-                scheduling = 'INTERRUPT'
+
+            handler = self._tool_handlers.get(name)
+            try:
+                result = handler(args) if handler else 'OK'
+            except Exception as e:
+                log.error(f'Tool {name} error: {e}')
+                result = 'Грешка.'
 
             log.info(f'Tool {name}: {result}')
             responses.append({
@@ -370,13 +331,100 @@ class VoiceAssistant:
         if self.gemini and responses:
             self.gemini.send_tool_responses(responses)
 
+    # ── Tools — each takes the call args and returns the result text ──
+
+    def _tool_set_address(self, args: dict) -> str:
+        address = args.get('address', '')
+        # IP lookup + file write — keep them off the event loop
+        self.loop.run_in_executor(None, self._save_address, address)
+        return 'Адресът е запазен.'
+
+    def _tool_set_volume(self, args: dict) -> str:
+        return self._handle_volume(args.get('action', '').lower())
+
+    def _tool_get_weather(self, args: dict) -> str:
+        town = args.get('town', '')
+        if not town:
+            loc     = location.get_current()
+            town    = loc.get('town', '')
+            country = loc.get('country', '')
+        else:
+            country = ''
+        w      = weather.get_weather(town, country)
+        result = weather.format_for_gemini(w)
+        log.info(f'Weather: {result}')
+        return result
+
+    def _tool_play_music(self, args: dict) -> str:
+        query = args.get('query', '')
+        self.loop.run_in_executor(None, self.spotify.play, query)
+        self._end_after_turn = True
+        return f'Пускам {query}' if query else 'Продължавам музиката.'
+
+    def _tool_next_track(self, args: dict) -> str:
+        self.loop.run_in_executor(None, self.spotify.next_track)
+        self._end_after_turn = True   # end after Gemini confirms
+        return 'Следваща песен.'
+
+    def _tool_previous_track(self, args: dict) -> str:
+        self.loop.run_in_executor(None, self.spotify.previous_track)
+        self._end_after_turn = True
+        return 'Предишна песен.'
+
+    def _tool_pause_music(self, args: dict) -> str:
+        self.loop.run_in_executor(None, self.spotify.pause)
+        self._end_after_turn = True
+        return 'Музиката е на пауза.'
+
+    def _tool_resume_music(self, args: dict) -> str:
+        self.loop.run_in_executor(None, self.spotify.resume)
+        self._end_after_turn = True
+        return 'Продължавам музиката.'
+
+    def _tool_transfer_music(self, args: dict) -> str:
+        self._end_after_turn = True
+        return self.spotify.transfer(args.get('device_name', ''))
+
+    def _tool_end_dialog(self, args: dict) -> str:
+        self._end_after_turn = True
+        return 'Дочуване!'
+
+    @staticmethod
+    def _open_mixer():
+        """ALSA Master mixer in-process; None → fall back to amixer."""
+        if not _HAS_ALSA:
+            return None
+        try:
+            return alsaaudio.Mixer('Master')
+        except Exception as e:
+            log.warning(f'ALSA mixer not available: {e} — using amixer')
+            return None
+
+    def _set_mixer(self, pct: int):
+        # e.g. "louder" at 100% — nothing to write
+        if pct == self._mixer_level:
+            return
+        self._mixer_level = pct
+        if self._mixer:
+            try:
+                self._mixer.setvolume(pct)
+                return
+            except Exception as e:
+                log.warning(f'ALSA mixer error: {e} — using amixer')
+        subprocess.run(
+            ['amixer', 'sset', 'Master', f'{pct}%'],
+            capture_output=True
+        )
+
+    def _save_address(self, address: str):
+        loc = location.get_current()
+        location.save_address(address, loc['country'], loc['town'])
+        log.info(f'Address saved: {address}')
+
     def _handle_volume(self, action: str) -> str:
         def set_master(pct: int) -> int:
             pct = max(0, min(100, pct))
-            subprocess.run(
-                ['amixer', 'sset', 'Master', f'{pct}%'],
-                capture_output=True
-            )
+            self._set_mixer(pct)
             self._volume = pct
             log.info(f'Volume: {pct}%')
             return pct
@@ -391,8 +439,7 @@ class VoiceAssistant:
             set_master(100)
             return 'Максимален звук.'
         elif action == 'mute':
-            subprocess.run(['amixer', 'sset', 'Master', '0%'],
-                           capture_output=True)
+            self._set_mixer(0)
             return 'Звукът е изключен.'
         elif action == 'unmute':
             v = set_master(self._volume)
@@ -417,11 +464,14 @@ class VoiceAssistant:
         if self.gemini:
             await self.gemini.disconnect()
             self.gemini = None
+        # No callbacks after disconnect — drop any timer a late one armed
+        self._cancel_timeout()
 
         self.speaker.clear()
 
-        # Restore Spotify volume
-        if self.spotify.connected:
+        # Restore Spotify volume — only if this dialog ducked it
+        if self._ducked:
+            self._ducked = False
             try:
                 await asyncio.wait_for(
                     self.loop.run_in_executor(None, self.spotify.set_volume, 100),
@@ -1,44 +1,51 @@
 import sounddevice as sd
 import numpy as np
 import scipy.signal
-import queue
+import collections
 import logging
 
 log = logging.getLogger(__name__)
 
 RATE      = 48000
 BLOCKSIZE = 1024
+QUEUE_MAX = 2000   # blocks (~43s at 48kHz)
+SCALE_I16 = np.float32(1.0 / 32767.0)
+
+# 24k → 48k counterpart of capture.FIR_DOWN (see there for why float32)
+FIR_UP    = scipy.signal.firwin(
+    2 * 10 * 2 + 1, 1.0 / 2, window=('kaiser', 5.0)
+).astype(np.float32)
 
 class Speaker:
     def __init__(self):
-        self._queue     = queue.Queue(maxsize=2000)
+        # Single producer / single consumer — deque append/popleft are
+        # atomic, so no Queue locks or condition variables per block.
+        self._queue     = collections.deque()
         self._stream    = None
         self._running   = False
-        self._ref_buf   = queue.Queue(maxsize=2000)
+        self._ref_buf   = collections.deque(maxlen=QUEUE_MAX)
         self._silence   = np.zeros(BLOCKSIZE, dtype=np.float32)
         self._remainder = np.array([], dtype=np.float32)
 
     def get_reference(self) -> np.ndarray:
         try:
-            return self._ref_buf.get_nowait()
-        except queue.Empty:
+            return self._ref_buf.popleft()
+        except IndexError:
             return self._silence
 
     def play_gemini(self, pcm_24k_bytes: bytes):
-        arr_24k  = np.frombuffer(pcm_24k_bytes, dtype=np.int16).astype(np.float32)
-        arr_48k  = scipy.signal.resample_poly(arr_24k, 2, 1)
-        arr_norm = arr_48k / 32767.0
-        self._enqueue_seamless(arr_norm)
+        # Normalize while casting (one pass), before the 2x upsample —
+        # resampling is linear, so the scale commutes and costs half.
+        pcm_24k  = np.frombuffer(pcm_24k_bytes, dtype=np.int16)
+        arr_24k  = np.multiply(pcm_24k, SCALE_I16, dtype=np.float32)
+        arr_48k  = scipy.signal.resample_poly(arr_24k, 2, 1, window=FIR_UP)
+        self._enqueue_seamless(arr_48k)
 
     def play_f32(self, audio_f32: np.ndarray):
         self._enqueue_seamless(audio_f32)
 
     def clear(self):
-        while not self._queue.empty():
-            try:
-                self._queue.get_nowait()
-            except queue.Empty:
-                break
+        self._queue.clear()
         self._remainder = np.array([], dtype=np.float32)
 
     def start(self):
@@ -68,27 +75,38 @@ class Speaker:
         log.info('Speaker stopped')
 
     def _enqueue_seamless(self, audio: np.ndarray):
+        audio = audio.astype(np.float32, copy=False)
+        start = 0
+        # Top up the carried-over tail into one block instead of
+        # concatenating it with the whole incoming buffer.
         if len(self._remainder) > 0:
-            audio = np.concatenate([self._remainder, audio])
-        n_blocks = len(audio) // BLOCKSIZE
-        for i in range(n_blocks):
-            block = audio[i*BLOCKSIZE:(i+1)*BLOCKSIZE].astype(np.float32)
-            try:
-                self._queue.put_nowait(block)
-            except queue.Full:
-                log.warning('Speaker queue full — dropping')
-        self._remainder = audio[n_blocks*BLOCKSIZE:].copy()
+            need = BLOCKSIZE - len(self._remainder)
+            if len(audio) < need:
+                self._remainder = np.concatenate([self._remainder, audio])
+                return
+            self._put([np.concatenate([self._remainder, audio[:need]])])
+            start = need
+        n_blocks = (len(audio) - start) // BLOCKSIZE
+        end      = start + n_blocks*BLOCKSIZE
+        # Rows are views into `audio` — callers never mutate what they hand over
+        self._put(audio[start:end].reshape(n_blocks, BLOCKSIZE))
+        self._remainder = audio[end:].copy()
+
+    def _put(self, blocks):
+        """Queue blocks in one deque.extend, dropping what doesn't fit."""
+        room = QUEUE_MAX - len(self._queue)
+        if len(blocks) > room:
+            log.warning('Speaker queue full — dropping')
+            blocks = blocks[:max(room, 0)]
+        self._queue.extend(blocks)
 
     def _callback(self, outdata, frames, time_info, status):
         if status:
             log.warning(f'Speaker: {status}')
         try:
-            chunk = self._queue.get_nowait()
-        except queue.Empty:
+            chunk = self._queue.popleft()
+        except IndexError:
             chunk = self._silence
-        try:
-            self._ref_buf.put_nowait(chunk.copy())
-        except queue.Full:
-            pass
-        outdata[:, 0] = chunk
-        outdata[:, 1] = chunk
\ No newline at end of file
+        # Blocks are never written after enqueue — no copy needed
+        self._ref_buf.append(chunk)
+        outdata[:] = chunk[:, np.newaxis]
\ No newline at end of file
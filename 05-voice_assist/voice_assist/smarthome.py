@@ -9,12 +9,31 @@ log = logging.getLogger(__name__)
 
 HA_URL_DEFAULT = 'http://homeassistant.local:8123'
 
+# Entity domains the assistant can control
+DOMAINS = (
+    'light.', 'switch.', 'cover.',
+    'climate.', 'fan.', 'media_player.'
+)
+
+COLOR_MAP = {
+    'red':    [255, 0, 0],     'червено':   [255, 0, 0],
+    'green':  [0, 255, 0],     'зелено':    [0, 255, 0],
+    'blue':   [0, 0, 255],     'синьо':     [0, 0, 255],
+    'white':  [255, 255, 255], 'бяло':      [255, 255, 255],
+    'yellow': [255, 255, 0],   'жълто':     [255, 255, 0],
+    'orange': [255, 165, 0],   'оранжево':  [255, 165, 0],
+    'purple': [128, 0, 128],   'лилаво':    [128, 0, 128],
+    'pink':   [255, 105, 180], 'розово':    [255, 105, 180],
+    'warm':   [255, 200, 100], 'топло':     [255, 200, 100],
+    'cool':   [200, 220, 255], 'студено':   [200, 220, 255],
+}
+
 class SmartHome:
     def __init__(self):
         self.connected = False
         self._token    = None
         self._url      = None
-        self._headers  = None
+        self._session  = None
         self._entities = {}
 
     def connect(self) -> bool:
@@ -25,17 +44,15 @@ class SmartHome:
 
         self._url     = os.environ.get('HA_URL', HA_URL_DEFAULT)
         self._token   = token
-        self._headers = {
+        # One keep-alive connection for every REST call (tool calls included)
+        self._session = requests.Session()
+        self._session.headers.update({
             'Authorization': f'Bearer {token}',
             'Content-Type':  'application/json'
-        }
+        })
 
         try:
-            r = requests.get(
-                f'{self._url}/api/',
-                headers=self._headers,
-                timeout=5
-            )
+            r = self._session.get(f'{self._url}/api/', timeout=5)
             if r.status_code == 200:
                 self.connected = True
                 log.info(f'Home Assistant connected: {self._url}')
@@ -49,28 +66,26 @@ class SmartHome:
             return False
 
     def _load_entities(self):
-        """Load entities via REST + aliases via WebSocket."""
+        """Load entities via REST + aliases via WebSocket.
+
+        Builds a new map and publishes it with one assignment, so readers
+        never see it half-filled during the (up to 30s) alias fetch.
+        """
         try:
-            self._entities = {}
+            entities = {}
 
             # Load friendly names from REST API
-            r = requests.get(
-                f'{self._url}/api/states',
-                headers=self._headers, timeout=10
-            )
+            r = self._session.get(f'{self._url}/api/states', timeout=10)
             entity_ids = []
             for entity in r.json():
                 entity_id = entity['entity_id']
-                if not entity_id.startswith((
-                    'light.', 'switch.', 'cover.',
-                    'climate.', 'fan.', 'media_player.'
-                )):
+                if not entity_id.startswith(DOMAINS):
                     continue
                 friendly = entity.get('attributes', {}).get(
                     'friendly_name', ''
                 ).lower()
                 if friendly:
-                    self._entities[friendly] = entity_id
+                    entities[friendly] = entity_id
                 entity_ids.append(entity_id)
 
             # Load aliases in a separate thread with its own event loop
@@ -99,9 +114,10 @@ class SmartHome:
                 log.warning(f'HA aliases error: {error[0]}')
 
             for alias, entity_id in aliases.items():
-                self._entities[alias.lower()] = entity_id
+                entities[alias.lower()] = entity_id
 
-            log.info(f'HA: loaded {len(self._entities)} entities/aliases '
+            self._entities = entities
+            log.info(f'HA: loaded {len(entities)} entities/aliases '
                      f'({len(aliases)} aliases)')
 
         except Exception as e:
@@ -167,9 +183,8 @@ class SmartHome:
         if extra:
             data.update(extra)
         try:
-            r = requests.post(
+            r = self._session.post(
                 f'{self._url}/api/services/{domain}/{service}',
-                headers=self._headers,
                 json=data,
                 timeout=5
             )
@@ -185,9 +200,8 @@ class SmartHome:
 
     def get_state(self, entity_id: str) -> dict | None:
         try:
-            r = requests.get(
+            r = self._session.get(
                 f'{self._url}/api/states/{entity_id}',
-                headers=self._headers,
                 timeout=5
             )
             if r.status_code == 200:
@@ -233,19 +247,7 @@ class SmartHome:
             return f'Яркостта на {entity_name} е {pct}%.' if ok else 'Грешка.'
 
         elif action == 'set_color' and color:
-            color_map = {
-                'red':    [255, 0, 0],     'червено':   [255, 0, 0],
-                'green':  [0, 255, 0],     'зелено':    [0, 255, 0],
-                'blue':   [0, 0, 255],     'синьо':     [0, 0, 255],
-                'white':  [255, 255, 255], 'бяло':      [255, 255, 255],
-                'yellow': [255, 255, 0],   'жълто':     [255, 255, 0],
-                'orange': [255, 165, 0],   'оранжево':  [255, 165, 0],
-                'purple': [128, 0, 128],   'лилаво':    [128, 0, 128],
-                'pink':   [255, 105, 180], 'розово':    [255, 105, 180],
-                'warm':   [255, 200, 100], 'топло':     [255, 200, 100],
-                'cool':   [200, 220, 255], 'студено':   [200, 220, 255],
-            }
-            rgb = color_map.get(color.lower())
+            rgb = COLOR_MAP.get(color.lower())
             if not rgb:
                 return f'Непознат цвят: {color}'
             ok = self._call_service(
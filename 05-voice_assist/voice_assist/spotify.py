@@ -1,8 +1,13 @@
+import atexit
+import concurrent.futures
 import logging
 import os
+import requests
 import spotipy
 import time
+from requests.adapters import HTTPAdapter
 from spotipy.oauth2 import SpotifyOAuth
+from urllib3.util.retry import Retry
 
 log = logging.getLogger(__name__)
 
@@ -12,11 +17,44 @@ SCOPE = (
     'user-read-currently-playing'
 )
 DEVICE_NAME = 'Chochko'
+DEVICE_TTL  = 30   # seconds a resolved Chochko device id is trusted
+STATE_TTL   = 5    # seconds a known playing/paused state is trusted
+
+def _make_session() -> requests.Session:
+    """One keep-alive pool for the API and token refreshes.
+
+    Retries are bounded for voice latency: at most two quick retries
+    (0.1s, 0.2s) on connection errors and 5xx. 429 is not retried — its
+    Retry-After can be many seconds — nor is POST (next/previous track),
+    where a retry after a lost response would skip twice. 4xx such as
+    403 VOLUME_CONTROL_DISALLOW fail at once.
+    """
+    retry = Retry(
+        total=2, connect=2, read=False, status=2,
+        allowed_methods=frozenset(['GET', 'PUT', 'DELETE']),
+        backoff_factor=0.1,
+        status_forcelist=(500, 502, 503, 504),
+        # urllib3 otherwise retries any 413/429/503 carrying Retry-After,
+        # whatever the forcelist says, and sleeps the full interval
+        respect_retry_after_header=False,
+    )
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(max_retries=retry))
+    return session
 
 class SpotifyController:
     def __init__(self):
         self._sp        = None
+        self._session   = None
+        # Runs the search while _ensure_active resolves/transfers the device
+        self._pool      = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='spotify'
+        )
         self._device_id = None
+        self._device_ts = 0.0    # when _chochko was last confirmed
+        self._chochko   = None   # cached Chochko id (may differ after transfer)
+        self._playing   = None   # last known is_playing, None = unknown
+        self._state_ts  = 0.0
         self.connected  = False
 
     def connect(self) -> bool:
@@ -31,13 +69,16 @@ class SpotifyController:
             return False
 
         try:
+            self._session = _make_session()
+            atexit.register(self._session.close)
             auth = SpotifyOAuth(
                 client_id=client_id,
                 client_secret=client_secret,
                 redirect_uri=redirect_uri,
                 scope=SCOPE,
                 open_browser=False,
-                cache_path=os.path.expanduser('~/.spotify_cache')
+                cache_path=os.path.expanduser('~/.spotify_cache'),
+                requests_session=self._session
             )
             token = auth.get_cached_token()
             if not token:
@@ -46,17 +87,15 @@ class SpotifyController:
             if auth.is_token_expired(token):
                 token = auth.refresh_access_token(token['refresh_token'])
 
-            self._sp       = spotipy.Spotify(auth=token['access_token'])
+            self._sp       = spotipy.Spotify(auth=token['access_token'],
+                                             requests_session=self._session)
             self._auth     = auth
             self._token    = token
             self.connected = True
 
-            # Try to find device — may not be ready yet after boot
-            self._device_id = self._find_device()
-            if self._device_id:
-                log.info(f'Spotify connected — device found')
-            else:
-                log.info('Spotify connected — device not yet visible (will retry)')
+            # No devices() lookup here — raspotify is often not visible yet
+            # right after boot; _ensure_active resolves it on first use.
+            log.info('Spotify connected')
             return True
 
         except Exception as e:
@@ -71,7 +110,10 @@ class SpotifyController:
                 self._token = self._auth.refresh_access_token(
                     self._token['refresh_token']
                 )
-                self._sp = spotipy.Spotify(auth=self._token['access_token'])
+                # Swap the token on the existing client — a new Spotify
+                # object would close the shared session when the old one
+                # is garbage-collected (Spotify.__del__)
+                self._sp.set_auth(self._token['access_token'])
                 log.info('Spotify token refreshed')
         except Exception as e:
             log.error(f'Token refresh error: {e}')
@@ -93,13 +135,59 @@ class SpotifyController:
 
     def _refresh_device(self):
         """Refresh device ID — retry if not found previously."""
-        self._device_id = self._find_device()
+        self.invalidate_device_cache()
+        self._device_id = self._cached_device()
+
+    def _cached_device(self) -> str | None:
+        """Chochko's device id, looked up at most once per DEVICE_TTL.
+
+        Back-to-back voice commands skip the devices() round-trip; a miss
+        is never cached, so a device that isn't up yet is retried.
+        """
+        if self._chochko and time.monotonic() - self._device_ts < DEVICE_TTL:
+            return self._chochko
+        self._chochko   = self._find_device()
+        self._device_ts = time.monotonic()
+        return self._chochko
+
+    def invalidate_device_cache(self):
+        """Force the next command to look the device up again."""
+        self._chochko = None
+
+    def _remember_state(self, playing: bool):
+        self._playing  = playing
+        self._state_ts = time.monotonic()
+
+    def is_playing(self) -> bool:
+        """Is music playing? Served from the last known state when fresh.
+
+        Our own play/pause/resume seed the state, so the duck on wake
+        usually needs no current_playback() round-trip.
+        """
+        if not self.connected:
+            return False
+        if (self._playing is not None
+                and time.monotonic() - self._state_ts < STATE_TTL):
+            return self._playing
+        try:
+            self._refresh_token_if_needed()   # duck path never hits _find_device
+            current = self._sp.current_playback()
+            playing = bool(current and current.get('is_playing'))
+            if current and current.get('device'):
+                self._device_id = current['device']['id']
+            self._remember_state(playing)
+            return playing
+        except Exception as e:
+            log.error(f'Spotify playback state error: {e}')
+            return False
 
     def _ensure_active(self) -> bool:
-        """Always refresh device ID first, then transfer."""
+        """Resolve the device ID (cached briefly), then transfer."""
         try:
-            # Always refresh — never trust cached ID
-            self._device_id = self._find_device()
+            # A device-cache hit skips _find_device, which used to be the
+            # only place the token got refreshed — local expiry check
+            self._refresh_token_if_needed()
+            self._device_id = self._cached_device()
 
             if not self._device_id:
                 log.warning('Chochko device not found in Spotify')
@@ -107,6 +195,7 @@ class SpotifyController:
 
             current = self._sp.current_playback()
             if current and current.get('device', {}).get('id') == self._device_id:
+                self._device_ts = time.monotonic()  # seen live — re-validate
                 return True  # already active
 
             log.info(f'Transferring playback to Chochko')
@@ -121,6 +210,7 @@ class SpotifyController:
             if '404' in str(e):
                 log.warning(f'Transfer failed 404 — device offline: {e}')
                 self._device_id = None
+                self.invalidate_device_cache()
             else:
                 log.error(f'Ensure active error: {e}')
             return False
@@ -133,7 +223,10 @@ class SpotifyController:
         if not self.connected:
             return
         try:
-            self._ensure_active()
+            # Use the device already known to be playing — ducking must
+            # not pull playback over to Chochko
+            if not self._device_id:
+                self._ensure_active()
             if not self._device_id:
                 log.warning("Cannot set volume: device ID not available.")
                 return
@@ -142,6 +235,8 @@ class SpotifyController:
         except spotipy.exceptions.SpotifyException as e:
             if '404' in str(e):
                 log.warning('Spotify volume: no active device — skipping')
+                self._device_id = None   # re-resolve on the next call
+                self.invalidate_device_cache()
             else:
                 log.error(f'Spotify volume error: {e}')
 
@@ -151,6 +246,7 @@ class SpotifyController:
             return
         try:
             self._sp.pause_playback(device_id=self._device_id)
+            self._remember_state(False)
             log.debug(f"Attempting to pause playback on device {self._device_id}.")
             log.info('Spotify paused')
         except spotipy.exceptions.SpotifyException as e:
@@ -166,6 +262,7 @@ class SpotifyController:
                 return
             log.debug(f"Attempting to resume playback on device {self._device_id}.")
             self._sp.start_playback(device_id=self._device_id)
+            self._remember_state(True)
             log.info('Spotify resumed')
         except spotipy.exceptions.SpotifyException as e:
             log.warning(f'Spotify resume error: {e}')
@@ -200,11 +297,16 @@ class SpotifyController:
             self.resume()
             return
         try:
+            # Refresh first so both calls below use a valid token
+            self._refresh_token_if_needed()
+            search = self._pool.submit(
+                self._sp.search, q=query, limit=1, type='track'
+            )
             if not self._ensure_active():
                 log.warning('Could not play: Chochko device not found')
                 return
-                
-            results = self._sp.search(q=query, limit=1, type='track')
+
+            results = search.result()
             tracks  = results['tracks']['items']
             log.debug(f"Spotify search for '{query}' returned {len(tracks)} tracks.")
 
@@ -216,6 +318,7 @@ class SpotifyController:
                 device_id=self._device_id,
                 uris=[uri]
             )
+            self._remember_state(True)
             log.info(f'Spotify playing: {tracks[0]["name"]}')
         except Exception as e:
             log.error(f'Spotify play error: {e}')
@@ -291,6 +394,7 @@ class SpotifyController:
                 force_play=True
             )
             self._device_id = target['id']
+            self._remember_state(True)   # force_play=True
             log.info(f'Spotify transferred to: {target["name"]}')
             return f'Музиката е прехвърлена на {target["name"]}.'
         except Exception as e:
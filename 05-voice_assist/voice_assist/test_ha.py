@@ -6,6 +6,7 @@ Usage: python ha_test.py
 """
 import sys
 import os
+import time
 import logging
 
 logging.basicConfig(
@@ -46,7 +47,7 @@ def test_control(sh, tests):
     for action, name, kwargs in tests:
         result = sh.control(action, name, **kwargs)
         print(f'  [{action:15}] {name!r:30} → {result}')
-        import time; time.sleep(1)
+        time.sleep(1)
 
 def main():
     print()
@@ -4,22 +4,20 @@ import asyncio
 import numpy as np
 from pathlib import Path
 
+from capture import CHUNK_APP   # int16 @ 16kHz arrives from MicCapture
+
 log = logging.getLogger(__name__)
- 
-RATE_HW   = 48000
-RATE_OWW  = 16000
-CHUNK_APP = 1280
-HW_CHUNK  = 1280  # int16 @ 16kHz arrives from MicCapture
 
 
 class WakeWordDetector:
     """Base class - same interface for both backends."""
 
     def __init__(self, model_path: str, threshold: float = 0.5):
-        self.chunk      = HW_CHUNK
+        self.chunk      = CHUNK_APP
         self.threshold  = threshold
         self._detected  = False
         self._ready_at  = 0.0
+        self._reset_pending = False
         self._on_detect = None
         self._loop      = None
 
@@ -38,17 +36,27 @@ class WakeWordDetector:
         raise NotImplementedError
 
     def reset(self, cooldown: float = 1.0):
-        self._detected = False
-        self._ready_at = time.time() + cooldown
-        self._reset_model()
+        """Re-arm after a dialog. The model state itself is cleared lazily
+        on the mic thread (see _ready), so the event loop never touches it
+        while predict() may be running."""
+        self._ready_at      = time.monotonic() + cooldown
+        self._reset_pending = True
+        self._detected      = False
         log.info(f'WakeWordDetector reset - cooldown {cooldown}s')
 
+    def _ready(self) -> bool:
+        """Per-chunk gate, called from process() on the mic thread."""
+        if self._reset_pending:
+            self._reset_pending = False
+            self._reset_model()
+        return not self._detected and time.monotonic() >= self._ready_at
+
     def _reset_model(self):
         raise NotImplementedError
 
     def _resample(self, pcm: np.ndarray) -> np.ndarray:
         """Audio arrives already as int16 at 16kHz from MicCapture."""
-        return pcm.astype('int16')
+        return pcm.astype(np.int16, copy=False)
 
 
 class OpenWakeWordDetector(WakeWordDetector):
@@ -65,7 +73,7 @@ class OpenWakeWordDetector(WakeWordDetector):
         log.info(f'openWakeWord ready: {self._model_name} threshold={threshold}')
 
     def process(self, pcm_16k_i16: np.ndarray):
-        if self._detected or time.time() < self._ready_at:
+        if not self._ready():
             return
         pcm_16k = self._resample(pcm_16k_i16)
         pred    = self._model.predict(pcm_16k)
@@ -106,7 +114,8 @@ class MicroWakeWordDetector(WakeWordDetector):
             )
 
         self._mww  = MicroWakeWord.from_config(config_path)
-        self._feat = MicroWakeWordFeatures()
+        self._features_cls = MicroWakeWordFeatures   # reused by every reset
+        self._feat = self._features_cls()
         # The model author calibrates this; honour it over the generic threshold.
         self._cutoff = self._mww.probability_cutoff
 
@@ -123,10 +132,10 @@ class MicroWakeWordDetector(WakeWordDetector):
         )
 
     def process(self, pcm_16k_i16: np.ndarray):
-        if self._detected or time.time() < self._ready_at:
+        if not self._ready():
             return
 
-        audio_bytes = pcm_16k_i16.astype('int16').tobytes()
+        audio_bytes = pcm_16k_i16.astype(np.int16, copy=False).tobytes()
 
         for feat in self._feat.process_streaming(audio_bytes):
             if self._has_prob:
@@ -147,9 +156,8 @@ class MicroWakeWordDetector(WakeWordDetector):
 
     def _reset_model(self):
         # Reload the model to clear streaming state, and reset the feature buffer.
-        from pymicro_wakeword import MicroWakeWordFeatures
         self._mww.reset()
-        self._feat = MicroWakeWordFeatures()
+        self._feat = self._features_cls()
 
 
 def create_detector(backend: str, model_path: str,